@@ -3,8 +3,52 @@ import sys
 import tkinter as tk
 import pygame
 import random
+from collections import deque
 import math
-from array import array
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    # Numba is optional; without it sounds are generated with plain NumPy.
+    HAVE_NUMBA = False
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# Compiled per-sample waveform generators, one per shape so each inner loop
+# is free of shape checks. Each returns n_samples int16 samples.
+
+@njit(cache=True, fastmath=True)
+def _gen_sine(n_samples, freq, duration, max_amp, decay, sample_rate):
+    out = np.empty(n_samples, np.int16)
+    for i in range(n_samples):
+        t = i / sample_rate
+        current_freq = freq * (1.0 - t / duration) if decay else freq
+        out[i] = int(max_amp * math.sin(2 * math.pi * current_freq * t))
+    return out
+
+@njit(cache=True, fastmath=True)
+def _gen_square(n_samples, freq, duration, max_amp, decay, sample_rate):
+    out = np.empty(n_samples, np.int16)
+    for i in range(n_samples):
+        t = i / sample_rate
+        current_freq = freq * (1.0 - t / duration) if decay else freq
+        out[i] = max_amp if math.sin(2 * math.pi * current_freq * t) > 0 else -max_amp
+    return out
+
+@njit(cache=True, fastmath=True)
+def _gen_sawtooth(n_samples, freq, duration, max_amp, decay, sample_rate):
+    out = np.empty(n_samples, np.int16)
+    for i in range(n_samples):
+        t = i / sample_rate
+        current_freq = freq * (1.0 - t / duration) if decay else freq
+        phase = current_freq * t
+        # phase is never negative, so truncation is the same as floor here.
+        out[i] = int(max_amp * (2 * (phase - int(phase + 0.5))))
+    return out
+
+_WAVE_KERNELS = {'sine': _gen_sine, 'square': _gen_square, 'sawtooth': _gen_sawtooth}
 
 class SoundManager:
     """
@@ -14,12 +58,20 @@ class SoundManager:
     def __init__(self):
         # Initialize pygame's mixer at a high quality sample rate.
         pygame.mixer.init(frequency=44100, size=-16, channels=1)
+        # Reserve a fixed channel per effect so playback skips the free-channel search.
+        pygame.mixer.set_num_channels(4)
+        pygame.mixer.set_reserved(2)
+        self.eat_channel = pygame.mixer.Channel(0)
+        self.death_channel = pygame.mixer.Channel(1)
         
         # Pre-generate the sound effects to avoid lag during gameplay.
         # A high-pitched, short square wave for eating food.
-        self.eat_sound = self._make_sound(freq=1200, duration=0.05, volume=0.4, shape='square')
+        # The raw buffers are kept alongside the Sound objects that play them.
+        self._eat_buf = self._make_sound(freq=1200, duration=0.05, volume=0.4, shape='square')
+        self.eat_sound = pygame.mixer.Sound(buffer=self._eat_buf)
         # A low-pitched, descending sawtooth wave for game over.
-        self.death_sound = self._make_sound(freq=400, duration=0.5, volume=0.5, shape='sawtooth', decay=True)
+        self._death_buf = self._make_sound(freq=400, duration=0.5, volume=0.5, shape='sawtooth', decay=True)
+        self.death_sound = pygame.mixer.Sound(buffer=self._death_buf)
 
     def _make_sound(self, freq, duration, volume, shape='sine', decay=False):
         """
@@ -31,41 +83,46 @@ class SoundManager:
             volume (float): The volume, from 0.0 to 1.0.
             shape (str): The waveform shape ('sine', 'square', 'sawtooth').
             decay (bool): If True, the frequency will drop over the duration.
+
+        Returns:
+            bytes: Signed 16-bit mono samples at the mixer's sample rate.
         """
         sample_rate = pygame.mixer.get_init()[0]
+
         n_samples = int(round(duration * sample_rate))
-        
-        # Create a buffer array to hold the sound wave data.
-        buf = array('h', [0] * n_samples)
         max_amp = int(32767 * volume)
 
-        for i in range(n_samples):
-            # Calculate time 't' for the wave function.
-            t = float(i) / sample_rate
-            
-            # Apply frequency decay if enabled.
-            current_freq = freq * (1 - t / duration) if decay else freq
-            
-            # Generate the waveform based on the selected shape.
-            if shape == 'square':
-                val = max_amp if math.sin(2 * math.pi * current_freq * t) > 0 else -max_amp
-            elif shape == 'sawtooth':
-                # Creates a saw wave that resets every period.
-                val = max_amp * (2 * (t * current_freq - math.floor(0.5 + t * current_freq)))
-            else: # Default to sine wave
-                val = max_amp * math.sin(2 * math.pi * current_freq * t)
-            
-            buf[i] = int(val)
-            
-        return pygame.mixer.Sound(buffer=buf)
+        if HAVE_NUMBA:
+            gen = _WAVE_KERNELS.get(shape, _gen_sine)
+            samples = gen(n_samples, float(freq), float(duration), max_amp, decay, float(sample_rate))
+            return samples.tobytes()
+
+        # Time 't' for every sample, computed in one shot.
+        t = np.arange(n_samples, dtype=np.float64) / sample_rate
+
+        # Apply frequency decay if enabled.
+        current_freq = freq * (1.0 - t / duration) if decay else freq
+        phase = current_freq * t
+
+        # Generate the waveform based on the selected shape.
+        if shape == 'square':
+            wave = np.where(np.sin(2 * np.pi * phase) > 0, 1.0, -1.0)
+        elif shape == 'sawtooth':
+            # Creates a saw wave that resets every period.
+            wave = 2 * (phase - np.rint(phase))
+        else: # Default to sine wave
+            wave = np.sin(2 * np.pi * phase)
+
+        samples = (wave * max_amp).astype(np.int16)
+        return samples.tobytes()
 
     def play_eat(self):
         """Plays the pre-generated 'eat' sound effect."""
-        self.eat_sound.play()
+        self.eat_channel.play(self.eat_sound)
 
     def play_death(self):
         """Plays the pre-generated 'death' sound effect."""
-        self.death_sound.play()
+        self.death_channel.play(self.death_sound)
 
 class SnakeGame:
     """
@@ -84,13 +141,26 @@ class SnakeGame:
         # Create a frame in the Tkinter window to hold the pygame display.
         self.embed = tk.Frame(self.root, width=600, height=400)
         self.embed.pack()
+        # Tk clears the frame to its background whenever it is mapped or exposed,
+        # wiping whatever pygame drew, so the game must repaint in full afterwards.
+        self.embed.bind('<Map>', self._on_expose)
+        self.embed.bind('<Expose>', self._on_expose)
         
         # Set environment variables to tell SDL (used by pygame) to draw in our frame.
         os.environ['SDL_WINDOWID'] = str(self.embed.winfo_id())
-        os.environ['SDL_VIDEODRIVER'] = 'windib'
+        # 'windib' is the SDL 1 name of the Windows driver; SDL 2 calls it 'windows'.
+        # Elsewhere, or if the user chose a driver, let SDL pick.
+        if sys.platform == 'win32':
+            os.environ.setdefault('SDL_VIDEODRIVER',
+                                  'windows' if pygame.get_sdl_version()[0] >= 2 else 'windib')
         
         # --- Pygame Initialization ---
         pygame.init()
+        # Only queue the events handle_input actually consumes. SDL window/expose
+        # events are blocked too; repaints after an expose are driven by the Tk
+        # <Map>/<Expose> bindings on the embed frame (see _on_expose).
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION])
         pygame.display.set_caption("#! ULTRA SNAKE 20XX [C] Team Flames")
         self.screen = pygame.display.set_mode((600, 400))
         self.clock = pygame.time.Clock()
@@ -101,23 +171,74 @@ class SnakeGame:
         self.move_rate = 10  # Snake moves 10 times per second
         self.frames_per_move = self.fps // self.move_rate
         self.frame_count = 0
+        self.bg_color = (20, 20, 30) # Dark blue background
+        self._rng = random.Random() # Per-game generator for food placement
 
         self.cell_size = 20
         self.grid_width = 600 // self.cell_size
         self.grid_height = 400 // self.cell_size
+        # Cells are stored as single ints, x * grid_height + y, rather than (x, y) tuples.
+        # Pixel coordinates of each cell's top-left corner, indexed by cell.
+        self.cell_px = tuple((x * self.cell_size, y * self.cell_size)
+                             for x in range(self.grid_width) for y in range(self.grid_height))
+
+        # --- Pre-rendered Cell Surfaces ---
+        # Snake segment with a slight border effect, baked in once.
+        self.snake_surf = pygame.Surface((self.cell_size, self.cell_size)).convert()
+        self.snake_surf.fill((0, 150, 50))
+        pygame.draw.rect(self.snake_surf, (0, 255, 100),
+                         (2, 2, self.cell_size - 4, self.cell_size - 4))
+        # Food (apple)
+        self.food_surf = pygame.Surface((self.cell_size, self.cell_size)).convert()
+        self.food_surf.fill((255, 0, 0))
 
         # --- Fonts and State ---
         self.title_font = pygame.font.Font(pygame.font.get_default_font(), 36)
         self.text_font = pygame.font.Font(pygame.font.get_default_font(), 24)
         self.state = 'menu'  # Game states: 'menu', 'playing', 'gameover'
+        # The menu and game over screens are static, so they are only repainted
+        # when this is set on entering them or when the embed frame is exposed.
+        self._dirty = True
+
+        # --- Pre-rendered Text ---
+        # Static strings are rasterized once; each entry is (surface, x-position).
+        self.title_surf = self._render_centered(self.title_font, "#! ULTRA SNAKE 20XX", (0, 255, 128))
+        self.prompt_surf = self._render_centered(self.text_font, "Click or Press Any Key to Start", (255, 255, 0))
+        self.footer_surf = self._render_centered(self.text_font, "20XX [C] - Team Flames", (150, 150, 150))
+        self.lose_surf = self._render_centered(self.title_font, "YOU LOSE", (255, 0, 0))
+        self.restart_surf = self._render_centered(self.text_font, "Restart? (Y/N)", (255, 255, 0))
+        # Score text is re-rendered only when the score changes: (score, surface).
+        self._score_cache = (-1, None)
+        self._final_score_cache = (-1, None)
         
         self.reset()
 
+    def _on_expose(self, event):
+        """Forces a full repaint on the next frame after Tk redraws the embed frame."""
+        self._full_redraw = True
+        self._dirty = True
+
+    def _render_centered(self, font, text, color):
+        """Renders text once and returns it with its horizontally centered x-position."""
+        surf = font.render(text, True, color)
+        return surf, (600 - surf.get_width()) // 2
+
     def reset(self):
         """Resets the game to its initial state."""
-        self.snake = [(self.grid_width // 2, self.grid_height // 2)]
+        self.snake = deque([(self.grid_width // 2) * self.grid_height + self.grid_height // 2])
+        # Mirror of the body cells for O(1) membership tests.
+        self.snake_set = {self.snake[0]}
+        # Unoccupied cells as a list plus a cell -> index map, so food can be
+        # placed and cells claimed/released in O(1).
+        self.free_cells = [pos for pos in range(self.grid_width * self.grid_height)
+                           if pos not in self.snake_set]
+        self.free_index = {pos: i for i, pos in enumerate(self.free_cells)}
         self.direction = (1, 0)
         self.next_direction = (1, 0)
+        # Cells whose contents changed since the last frame, and whether the
+        # whole screen must be repainted (set on entering a new game).
+        self._changed_cells = []
+        self._full_redraw = True
         self.spawn_food()
         self.score = 0
         self.game_over = False
@@ -125,11 +246,21 @@ class SnakeGame:
 
     def spawn_food(self):
         """Places food in a random, unoccupied cell on the grid."""
-        while True:
-            pos = (random.randrange(self.grid_width), random.randrange(self.grid_height))
-            if pos not in self.snake:
-                self.food = pos
-                return
+        self.food = self._rng.choice(self.free_cells)
+        self._changed_cells.append(self.food)
+
+    def _occupy(self, pos):
+        """Removes a cell from the free list by swapping it with the last entry."""
+        i = self.free_index.pop(pos)
+        last = self.free_cells.pop()
+        if last != pos:
+            self.free_cells[i] = last
+            self.free_index[last] = i
+
+    def _release(self, pos):
+        """Returns a cell to the free list."""
+        self.free_index[pos] = len(self.free_cells)
+        self.free_cells.append(pos)
 
     def handle_input(self):
         """Processes all user input from both mouse and keyboard."""
@@ -159,55 +290,80 @@ class SnakeGame:
                 elif event.key in (pygame.K_RIGHT, pygame.K_d) and self.direction[0] == 0:
                     self.next_direction = (1, 0)
 
-        # --- In-Game Mouse Input ---
-        if self.state == 'playing':
-            mx, my = pygame.mouse.get_pos()
-            head_x, head_y = self.snake[0]
-            # Convert grid coordinates to pixel coordinates for comparison.
-            head_px = head_x * self.cell_size + self.cell_size / 2
-            head_py = head_y * self.cell_size + self.cell_size / 2
-            
-            dx, dy = mx - head_px, my - head_py
-            
-            # Determine dominant axis of mouse movement relative to the snake head.
-            if abs(dx) > abs(dy):
-                new_dir = (1 if dx > 0 else -1, 0)
-            else:
-                new_dir = (0, 1 if dy > 0 else -1)
+            # --- In-Game Mouse Input ---
+            # Only react when the cursor actually moves, instead of polling every frame.
+            if self.state == 'playing' and event.type == pygame.MOUSEMOTION:
+                mx, my = event.pos
+                head_x, head_y = divmod(self.snake[0], self.grid_height)
+                # Convert grid coordinates to pixel coordinates for comparison.
+                head_px = head_x * self.cell_size + self.cell_size / 2
+                head_py = head_y * self.cell_size + self.cell_size / 2
+                
+                dx, dy = mx - head_px, my - head_py
+                
+                # Determine dominant axis of mouse movement relative to the snake head.
+                if abs(dx) > abs(dy):
+                    new_dir = (1 if dx > 0 else -1, 0)
+                else:
+                    new_dir = (0, 1 if dy > 0 else -1)
 
-            # Update direction if it's not a direct reversal.
-            if new_dir != (-self.direction[0], -self.direction[1]):
-                self.next_direction = new_dir
+                # Update direction if it's not a direct reversal.
+                if new_dir != (-self.direction[0], -self.direction[1]):
+                    self.next_direction = new_dir
 
 
     def update(self):
         """Updates the game logic, such as moving the snake and checking for collisions."""
-        self.direction = self.next_direction
-        head = self.snake[0]
-        new_head = (head[0] + self.direction[0], head[1] + self.direction[1])
-
-        # Check for collisions with walls or self.
-        if (new_head in self.snake or
-            not 0 <= new_head[0] < self.grid_width or
-            not 0 <= new_head[1] < self.grid_height):
+        snake, snake_set = self.snake, self.snake_set
+        gw, gh = self.grid_width, self.grid_height
+        dx, dy = self.direction = self.next_direction
+        head = snake[0]
+        nx = head // gh + dx
+        ny = head % gh + dy
+        new_head = nx * gh + ny
+
+        # Check for collisions with walls or self. The bounds tests run first, since
+        # an off-grid (nx, ny) can pack to the same int as an on-grid cell.
+        if (nx < 0 or ny < 0 or nx >= gw or ny >= gh or
+            new_head in snake_set):
             self.sound.play_death()
             self.game_over = True
             self.state = 'gameover'
+            self._dirty = True
             return
             
-        self.snake.insert(0, new_head)
+        snake.appendleft(new_head)
+        snake_set.add(new_head)
+        self._occupy(new_head)
+        self._changed_cells.append(new_head)
         
         # Check for eating food.
         if new_head == self.food:
             self.score += 1
             self.sound.play_eat()
+            if not self.free_cells:
+                # The snake fills the whole board, so there is nowhere left for food.
+                self.game_over = True
+                self.state = 'gameover'
+                self._dirty = True
+                return
             self.spawn_food()
         else:
-            self.snake.pop()
+            tail = snake.pop()
+            snake_set.discard(tail)
+            self._release(tail)
+            self._changed_cells.append(tail)
 
     def draw(self):
         """Handles all rendering to the screen based on the current game state."""
-        self.screen.fill((20, 20, 30)) # Dark blue background
+        if self.state == 'playing' and not self._full_redraw:
+            # Mid-game, only the cells touched since the last frame are uploaded.
+            pygame.display.update(self.draw_game_changes())
+            return
+        if self.state != 'playing' and not self._dirty:
+            return
+
+        self.screen.fill(self.bg_color)
 
         if self.state == 'menu':
             self.draw_menu()
@@ -217,63 +373,118 @@ class SnakeGame:
             self.draw_gameover()
         
         pygame.display.update()
-        # Update the Tkinter window to ensure it remains responsive.
-        self.root.update()
+        self._dirty = False
 
     def draw_menu(self):
         """Draws the main menu screen."""
-        title = self.title_font.render("#! ULTRA SNAKE 20XX", True, (0, 255, 128))
-        self.screen.blit(title, ((600 - title.get_width()) // 2, 140))
+        title, title_x = self.title_surf
+        self.screen.blit(title, (title_x, 140))
         
-        prompt = self.text_font.render("Click or Press Any Key to Start", True, (255, 255, 0))
-        self.screen.blit(prompt, ((600 - prompt.get_width()) // 2, 220))
+        prompt, prompt_x = self.prompt_surf
+        self.screen.blit(prompt, (prompt_x, 220))
         
-        footer = self.text_font.render("20XX [C] - Team Flames", True, (150, 150, 150))
-        self.screen.blit(footer, ((600 - footer.get_width()) // 2, 360))
+        footer, footer_x = self.footer_surf
+        self.screen.blit(footer, (footer_x, 360))
 
     def draw_game(self):
-        """Draws the game elements: snake, food, and score."""
-        # Draw snake with a slight border effect
-        for x, y in self.snake:
-            pygame.draw.rect(self.screen, (0, 150, 50), 
-                             (x * self.cell_size, y * self.cell_size, self.cell_size, self.cell_size))
-            pygame.draw.rect(self.screen, (0, 255, 100), 
-                             (x * self.cell_size + 2, y * self.cell_size + 2, self.cell_size - 4, self.cell_size - 4))
+        """Draws the full game screen: snake, food, and score."""
+        blit = self.screen.blit
+        cell_px = self.cell_px
+        snake_surf = self.snake_surf
+
+        # Draw snake segments and food from the pre-rendered surfaces.
+        for pos in self.snake:
+            blit(snake_surf, cell_px[pos])
         
-        # Draw food (apple)
-        fx, fy = self.food
-        pygame.draw.rect(self.screen, (255, 0, 0), 
-                         (fx * self.cell_size, fy * self.cell_size, self.cell_size, self.cell_size))
+        blit(self.food_surf, cell_px[self.food])
 
-        # Draw score
-        score_text = self.text_font.render(f"Score: {self.score}", True, (255, 255, 255))
-        self.screen.blit(score_text, (10, 10))
+        self._draw_score()
+        self._changed_cells.clear()
+        self._full_redraw = False
+
+    def draw_game_changes(self):
+        """
+        Redraws only the cells changed by the last update(s) and returns
+        their screen rects for a partial display update.
+        """
+        dirty = [self._draw_cell(pos) for pos in self._changed_cells]
+        self._changed_cells.clear()
+
+        # The score overlays the grid, so repaint it when it changes or when a
+        # changed cell was drawn underneath it.
+        score_rect = self._score_rect
+        if self.score != self._score_cache[0] or score_rect.collidelist(dirty) != -1:
+            cs = self.cell_size
+            gh = self.grid_height
+            # Clear the old text by repainting every cell it covered.
+            for x in range(score_rect.left // cs, (score_rect.right - 1) // cs + 1):
+                for y in range(score_rect.top // cs, (score_rect.bottom - 1) // cs + 1):
+                    dirty.append(self._draw_cell(x * gh + y))
+            self._draw_score()
+            dirty.append(self._score_rect)
+
+        return dirty
+
+    def _draw_cell(self, pos):
+        """Repaints a single grid cell from the current game state and returns its rect."""
+        cs = self.cell_size
+        rect = pygame.Rect(self.cell_px[pos], (cs, cs))
+        if pos in self.snake_set:
+            self.screen.blit(self.snake_surf, rect)
+        elif pos == self.food:
+            self.screen.blit(self.food_surf, rect)
+        else:
+            self.screen.fill(self.bg_color, rect)
+        return rect
+
+    def _draw_score(self):
+        """Draws the score, re-rendering it only when it has changed."""
+        if self.score != self._score_cache[0]:
+            self._score_cache = (self.score, self.text_font.render(f"Score: {self.score}", True, (255, 255, 255)))
+        self._score_rect = self.screen.blit(self._score_cache[1], (10, 10))
 
     def draw_gameover(self):
         """Draws the game over screen."""
-        lose = self.title_font.render("YOU LOSE", True, (255, 0, 0))
-        self.screen.blit(lose, ((600 - lose.get_width()) // 2, 140))
+        lose, lose_x = self.lose_surf
+        self.screen.blit(lose, (lose_x, 140))
 
-        final_score = self.text_font.render(f"Final Score: {self.score}", True, (255, 255, 255))
-        self.screen.blit(final_score, ((600-final_score.get_width())//2, 220))
+        if self.score != self._final_score_cache[0]:
+            self._final_score_cache = (self.score, self._render_centered(
+                self.text_font, f"Final Score: {self.score}", (255, 255, 255)))
+        final_score, final_x = self._final_score_cache[1]
+        self.screen.blit(final_score, (final_x, 220))
 
-        prompt = self.text_font.render("Restart? (Y/N)", True, (255, 255, 0))
-        self.screen.blit(prompt, ((600 - prompt.get_width()) // 2, 280))
+        prompt, prompt_x = self.restart_surf
+        self.screen.blit(prompt, (prompt_x, 280))
 
     def run(self):
         """The main game loop."""
+        handle_input, update, draw = self.handle_input, self.update, self.draw
+        tick, fps = self.clock.tick, self.fps
+        root = self.root
+        tk_frame_count = 0
         while True:
-            self.handle_input()
+            handle_input()
             
             if self.state == 'playing':
                 # Control snake speed independently of frame rate
                 self.frame_count += 1
                 if self.frame_count >= self.frames_per_move:
                     self.frame_count = 0
-                    self.update()
+                    update()
             
-            self.draw()
-            self.clock.tick(self.fps)
+            draw()
+
+            # Keep the Tkinter window responsive: idle tasks every frame, but full
+            # event dispatch only at the snake's move rate.
+            tk_frame_count += 1
+            if tk_frame_count >= self.frames_per_move:
+                tk_frame_count = 0
+                root.update()
+            else:
+                root.update_idletasks()
+
+            tick(fps)
 
     def _quit(self):
         """A clean exit function to close both pygame and tkinter."""